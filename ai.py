@@ -8,16 +8,22 @@ Uses OpenAI GPT API when OPENAI_API_KEY is set,
 otherwise falls back to deterministic rule-based logic.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from datetime import datetime
+from typing import TYPE_CHECKING
 import os
 import math
+import heapq
+import orjson
 
 from schemas.task import (
     Task, AIPriorityRequest, AIPriorityResponse, AIRecommendation,
-    AIDailyPlanResponse, AITimeBlock, AISuggestRequest, AISuggestResponse
+    AIDailyPlanResponse, AITimeBlock, AISuggestRequest, AISuggestResponse, parse_iso,
 )
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 router = APIRouter()
 
 
@@ -25,11 +31,11 @@ router = APIRouter()
 
 PRIORITY_SCORE = {"critical": 100, "high": 75, "medium": 50, "low": 25}
 
-def urgency_score(task: Task) -> float:
+def urgency_score(task: Task, now: datetime) -> float:
     if not task.deadline:
         return PRIORITY_SCORE.get(task.priority, 0)
     try:
-        diff_hours = (datetime.fromisoformat(task.deadline) - datetime.now()).total_seconds() / 3600
+        diff_hours = (parse_iso(task.deadline) - now).total_seconds() / 3600
         if diff_hours < 0:
             time_score = 200
         elif diff_hours < 24:
@@ -45,12 +51,12 @@ def urgency_score(task: Task) -> float:
         return PRIORITY_SCORE.get(task.priority, 0)
 
 
-def format_deadline(task: Task) -> str:
+def format_deadline(task: Task, now: datetime) -> str:
     if not task.deadline:
         return "no deadline"
     try:
-        d = datetime.fromisoformat(task.deadline)
-        diff = d - datetime.now()
+        d = parse_iso(task.deadline)
+        diff = d - now
         hours = int(diff.total_seconds() / 3600)
         if hours < 0:
             return f"overdue by {abs(hours//24)}d"
@@ -64,35 +70,48 @@ def format_deadline(task: Task) -> str:
 
 # ─── Fallback Rule-Based AI ───────────────────────────────────────────────────
 
-def rule_based_priorities(tasks: list[Task]) -> AIPriorityResponse:
-    active = [t for t in tasks if t.status != "completed"]
-    sorted_tasks = sorted(active, key=urgency_score, reverse=True)
+# Reasons for ranks 2 and 3 are fixed; only the top pick mentions its deadline
+FOLLOW_UP_REASONS = [
+    "⚡ Second priority: Significant impact on project timeline. Schedule immediately after task #1.",
+    "📋 Third priority: Important but manageable. Block time this afternoon.",
+]
+SUGGESTED_TIMES = ["9:00 AM – 11:00 AM", "11:30 AM – 1:00 PM", "2:00 PM – 4:00 PM"]
 
-    reasons = [
-        "🔥 Highest urgency: {p} priority with deadline {d}. Clear your schedule and start now.",
-        "⚡ Second priority: Significant impact on project timeline. Schedule immediately after task #1.",
-        "📋 Third priority: Important but manageable. Block time this afternoon.",
-    ]
-    suggestions = ["9:00 AM – 11:00 AM", "11:30 AM – 1:00 PM", "2:00 PM – 4:00 PM"]
+
+def rule_based_priorities(tasks: list[Task]) -> AIPriorityResponse:
+    now = datetime.now()
+    # Single pass: score active tasks and accumulate the insight totals
+    scored = []
+    critical_count = 0
+    total_hours = 0.0
+    for t in tasks:
+        if t.status == "completed":
+            continue
+        scored.append((urgency_score(t, now), t))
+        if t.priority == "critical":
+            critical_count += 1
+        total_hours += t.estimatedHours or 2
+    top_tasks = [t for _, t in heapq.nlargest(3, scored, key=lambda x: x[0])]
 
     recs = [
         AIRecommendation(
             taskId=t.id,
             taskTitle=t.title,
             rank=i + 1,
-            reason=reasons[i].format(p=t.priority, d=format_deadline(t)),
-            suggestedTime=suggestions[i],
+            reason=(
+                f"🔥 Highest urgency: {t.priority} priority with deadline {format_deadline(t, now)}. "
+                "Clear your schedule and start now."
+                if i == 0 else FOLLOW_UP_REASONS[i - 1]
+            ),
+            suggestedTime=SUGGESTED_TIMES[i],
         )
-        for i, t in enumerate(sorted_tasks[:3])
+        for i, t in enumerate(top_tasks)
     ]
 
-    critical_count = sum(1 for t in active if t.priority == "critical")
-    total_hours = sum(t.estimatedHours or 2 for t in active)
-
     return AIPriorityResponse(
         recommendations=recs,
         insight=(
-            f"You have {len(active)} active tasks with {critical_count} marked critical. "
+            f"You have {len(scored)} active tasks with {critical_count} marked critical. "
             f"Estimated {total_hours:.1f}h of focused work. "
             f"I recommend addressing the top 3 priorities before 4 PM today."
         ),
@@ -100,10 +119,9 @@ def rule_based_priorities(tasks: list[Task]) -> AIPriorityResponse:
 
 
 def rule_based_daily_plan(tasks: list[Task]) -> AIDailyPlanResponse:
-    active = sorted(
-        [t for t in tasks if t.status != "completed"],
-        key=urgency_score, reverse=True
-    )
+    now = datetime.now()
+    scored = [(urgency_score(t, now), t) for t in tasks if t.status != "completed"]
+    top_tasks = [t for _, t in heapq.nlargest(4, scored, key=lambda x: x[0])]
 
     block_templates = [
         {"label": "Deep Work Block", "emoji": "🧠", "tip": "Silence all notifications. Use 90-min focus sprints with 10-min breaks."},
@@ -113,15 +131,15 @@ def rule_based_daily_plan(tasks: list[Task]) -> AIDailyPlanResponse:
     ]
 
     time_blocks = []
-    current_hour = 9.0
+    total_hours = 0.0
+    current_min = 9 * 60
 
-    for i, task in enumerate(active[:4]):
+    for i, task in enumerate(top_tasks):
         dur = task.estimatedHours or 2
-        start_h = int(current_hour)
-        start_m = int((current_hour % 1) * 60)
-        end_hour = current_hour + dur
-        end_h = int(end_hour)
-        end_m = int((end_hour % 1) * 60)
+        total_hours += dur
+        dur_min = round(dur * 60)
+        start_h, start_m = divmod(current_min, 60)
+        end_h, end_m = divmod(current_min + dur_min, 60)
 
         tpl = block_templates[i % len(block_templates)]
         time_blocks.append(AITimeBlock(
@@ -131,9 +149,8 @@ def rule_based_daily_plan(tasks: list[Task]) -> AIDailyPlanResponse:
             taskId=task.id,
             **tpl,
         ))
-        current_hour += math.ceil(dur) + (0.5 if i == 1 else 0)  # lunch break
-
-    total_hours = sum(t.estimatedHours or 2 for t in active[:4])
+        # Advance by the estimate rounded up to whole hours, plus a lunch break after the second block
+        current_min += math.ceil(dur) * 60 + (30 if i == 1 else 0)
 
     return AIDailyPlanResponse(
         timeBlocks=time_blocks,
@@ -149,21 +166,21 @@ def rule_based_daily_plan(tasks: list[Task]) -> AIDailyPlanResponse:
     )
 
 
+SUGGEST_RULES = [
+    (["finance", "budget", "invoice", "payroll", "audit"], "critical", 4.0, "Gather all data sources before starting. Book 2h uninterrupted blocks.", 0.92),
+    (["security", "vulnerability", "breach", "incident"], "critical", 3.0, "Escalate immediately. Loop in stakeholders before diving into solutions.", 0.95),
+    (["engineer", "architecture", "code", "system", "deploy", "infra"], "high", 3.0, "Break into vertical slices. Time-box at 90-min intervals.", 0.88),
+    (["deadline", "urgent", "asap", "critical", "launch"], "high", 2.5, "Clarify scope before starting. Identify blockers in the first 15 minutes.", 0.90),
+    (["market", "campaign", "content", "brand", "seo"], "medium", 2.5, "Review competitor analysis first. Batch similar tasks for flow state.", 0.85),
+    (["meeting", "sync", "review", "interview", "1:1"], "medium", 1.5, "Prepare a clear agenda. Time-box strictly with a timer.", 0.80),
+    (["document", "readme", "wiki", "report", "analysis"], "medium", 2.0, "Start with an outline before writing. Use headers to structure thinking.", 0.82),
+    (["research", "explore", "investigate", "spike"], "low", 3.0, "Time-box research to avoid rabbit holes. Set a clear output goal.", 0.78),
+]
+
 def rule_based_suggest(title: str, description: str) -> AISuggestResponse:
     text = (title + " " + (description or "")).lower()
 
-    rules = [
-        (["finance", "budget", "invoice", "payroll", "audit"], "critical", 4.0, "Gather all data sources before starting. Book 2h uninterrupted blocks.", 0.92),
-        (["security", "vulnerability", "breach", "incident"], "critical", 3.0, "Escalate immediately. Loop in stakeholders before diving into solutions.", 0.95),
-        (["engineer", "architecture", "code", "system", "deploy", "infra"], "high", 3.0, "Break into vertical slices. Time-box at 90-min intervals.", 0.88),
-        (["deadline", "urgent", "asap", "critical", "launch"], "high", 2.5, "Clarify scope before starting. Identify blockers in the first 15 minutes.", 0.90),
-        (["market", "campaign", "content", "brand", "seo"], "medium", 2.5, "Review competitor analysis first. Batch similar tasks for flow state.", 0.85),
-        (["meeting", "sync", "review", "interview", "1:1"], "medium", 1.5, "Prepare a clear agenda. Time-box strictly with a timer.", 0.80),
-        (["document", "readme", "wiki", "report", "analysis"], "medium", 2.0, "Start with an outline before writing. Use headers to structure thinking.", 0.82),
-        (["research", "explore", "investigate", "spike"], "low", 3.0, "Time-box research to avoid rabbit holes. Set a clear output goal.", 0.78),
-    ]
-
-    for keywords, priority, hours, tip, confidence in rules:
+    for keywords, priority, hours, tip, confidence in SUGGEST_RULES:
         if any(kw in text for kw in keywords):
             return AISuggestResponse(priority=priority, estimatedHours=hours, tip=tip, confidence=confidence)
 
@@ -177,16 +194,9 @@ def rule_based_suggest(title: str, description: str) -> AISuggestResponse:
 
 # ─── OpenAI Integration (optional) ───────────────────────────────────────────
 
-async def openai_priorities(tasks: list[Task]) -> AIPriorityResponse:
-    """Live OpenAI call — falls back to rule-based if API key not set"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return rule_based_priorities(tasks)
-
+async def openai_priorities(tasks: list[Task], client: "AsyncOpenAI") -> AIPriorityResponse:
+    """Live OpenAI call using the app-wide client — falls back to rule-based on any error"""
     try:
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=api_key)
-
         task_summary = "\n".join([
             f"- ID:{t.id} | Title:{t.title} | Priority:{t.priority} | "
             f"Deadline:{t.deadline or 'none'} | Status:{t.status} | Hours:{t.estimatedHours or 2}"
@@ -201,10 +211,10 @@ async def openai_priorities(tasks: list[Task]) -> AIPriorityResponse:
             ],
             temperature=0.3,
             max_tokens=800,
+            response_format={"type": "json_object"},
         )
 
-        import json
-        data = json.loads(response.choices[0].message.content)
+        data = orjson.loads(response.choices[0].message.content)
         recs = [AIRecommendation(**r) for r in data["recommendations"]]
         return AIPriorityResponse(recommendations=recs, insight=data["insight"])
 
@@ -216,7 +226,7 @@ async def openai_priorities(tasks: list[Task]) -> AIPriorityResponse:
 # ─── Route Handlers ──────────────────────────────────────────────────────────
 
 @router.post("/priorities", response_model=AIPriorityResponse)
-async def analyze_priorities(request: AIPriorityRequest):
+async def analyze_priorities(request: AIPriorityRequest, http_request: Request):
     """
     Analyze task list and return AI-powered priority rankings.
     Uses OpenAI GPT if OPENAI_API_KEY is set, otherwise rule-based logic.
@@ -224,9 +234,9 @@ async def analyze_priorities(request: AIPriorityRequest):
     if not request.tasks:
         raise HTTPException(status_code=400, detail="Task list cannot be empty")
 
-    use_openai = bool(os.getenv("OPENAI_API_KEY"))
-    if use_openai:
-        return await openai_priorities(request.tasks)
+    client = getattr(http_request.app.state, "openai_client", None)
+    if client is not None:
+        return await openai_priorities(request.tasks, client)
     return rule_based_priorities(request.tasks)
 
 
@@ -1,45 +1,61 @@
 """
 AI Smart Productivity Platform - FastAPI Backend
 ================================================
-Install:  pip install fastapi uvicorn openai pydantic python-dotenv
+Install:  pip install fastapi uvicorn openai pydantic python-dotenv orjson
 Run:      uvicorn main:app --reload --port 8000
 Docs:     http://localhost:8000/docs
 """
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from routes.tasks import router as tasks_router, task_store
+from routes.tasks import router as tasks_router, task_store, FASTAPI_NATIVE_JSON
 from routes.ai import router as ai_router
 import uvicorn
+import os
+import sys
 from datetime import datetime
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Seed demo data on startup"""
+    """Seed demo data and create the shared OpenAI client on startup"""
     from schemas.task import Task
     import uuid
 
+    # One client for the app lifetime so requests reuse its connection pool
+    app.state.openai_client = None
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        try:
+            from openai import AsyncOpenAI
+            app.state.openai_client = AsyncOpenAI(api_key=api_key)
+        except ImportError as e:
+            print(f"OpenAI client unavailable, using rule-based AI: {e}")
+
+    # Static, known-valid seed data: skip validation; createdAt comes from the default factory
+    now = datetime.now()
     demo_tasks = [
-        Task(id=str(uuid.uuid4()), title="Design System Architecture",
-             description="Plan microservices and API gateway patterns",
-             deadline=datetime.now().replace(hour=17, minute=0).isoformat(),
-             priority="critical", status="in-progress", category="Engineering", estimatedHours=4),
-        Task(id=str(uuid.uuid4()), title="Q4 Marketing Report",
-             description="Compile analytics for board presentation",
-             deadline=datetime.now().replace(hour=12, minute=0).isoformat(),
-             priority="high", status="pending", category="Marketing", estimatedHours=3),
-        Task(id=str(uuid.uuid4()), title="Budget Planning FY2025",
-             description="Departmental budget proposals and resource allocation",
-             deadline=datetime.now().replace(hour=16, minute=0).isoformat(),
-             priority="critical", status="pending", category="Finance", estimatedHours=6),
+        Task.model_construct(id=str(uuid.uuid4()), title="Design System Architecture",
+                             description="Plan microservices and API gateway patterns",
+                             deadline=now.replace(hour=17, minute=0).isoformat(),
+                             priority="critical", status="in-progress", category="Engineering", estimatedHours=4.0),
+        Task.model_construct(id=str(uuid.uuid4()), title="Q4 Marketing Report",
+                             description="Compile analytics for board presentation",
+                             deadline=now.replace(hour=12, minute=0).isoformat(),
+                             priority="high", status="pending", category="Marketing", estimatedHours=3.0),
+        Task.model_construct(id=str(uuid.uuid4()), title="Budget Planning FY2025",
+                             description="Departmental budget proposals and resource allocation",
+                             deadline=now.replace(hour=16, minute=0).isoformat(),
+                             priority="critical", status="pending", category="Finance", estimatedHours=6.0),
     ]
-    for t in demo_tasks:
-        task_store[t.id] = t
+    task_store.update({t.id: t for t in demo_tasks})
 
     print("✅ Demo tasks seeded")
     yield
+    if app.state.openai_client is not None:
+        await app.state.openai_client.close()
     print("🛑 Shutting down...")
 
 
@@ -48,6 +64,8 @@ app = FastAPI(
     description="FastAPI backend with in-memory storage + AI-powered task intelligence",
     version="1.0.0",
     lifespan=lifespan,
+    # Leave the default in place on newer FastAPI so its Pydantic fast path applies
+    **({} if FASTAPI_NATIVE_JSON else {"default_response_class": ORJSONResponse}),
 )
 
 app.add_middleware(
@@ -83,4 +101,9 @@ async def health():
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # uvloop has no Windows build; fall back to the stock asyncio loop there
+    uvicorn.run(
+        "main:app", host="0.0.0.0", port=8000, reload=True,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )
@@ -5,6 +5,8 @@ Pydantic models for the AI Smart Productivity Platform
 from pydantic import BaseModel, Field
 from typing import Optional, Literal
 from datetime import datetime
+from enum import IntEnum
+from functools import lru_cache
 import uuid
 
 
@@ -12,6 +14,28 @@ PriorityType = Literal["critical", "high", "medium", "low"]
 StatusType = Literal["pending", "in-progress", "completed", "overdue"]
 
 
+class StatusCode(IntEnum):
+    """Integer form of StatusType, used to index the store's running status counts"""
+    PENDING = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+    OVERDUE = 3
+
+
+STATUS_CODES: dict[str, StatusCode] = {
+    "pending": StatusCode.PENDING,
+    "in-progress": StatusCode.IN_PROGRESS,
+    "completed": StatusCode.COMPLETED,
+    "overdue": StatusCode.OVERDUE,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_iso(s: str) -> datetime:
+    """Memoized datetime.fromisoformat — invalid strings raise and are never cached"""
+    return datetime.fromisoformat(s)
+
+
 class TaskBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Task title")
     description: Optional[str] = Field(None, max_length=2000, description="Detailed description")
@@ -8,27 +8,162 @@ DELETE /api/tasks/{id}    - Delete task
 GET    /api/tasks/stats   - Get aggregate stats
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, __version__ as fastapi_version
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from typing import Optional
 from datetime import datetime
+import heapq
+import itertools
 
-from schemas.task import Task, TaskCreate, TaskUpdate, TasksStatsResponse
+from schemas.task import (
+    Task, TaskCreate, TaskUpdate, TasksStatsResponse,
+    StatusCode, STATUS_CODES, parse_iso,
+)
 
 router = APIRouter()
 
+# FastAPI >= 0.131 serializes response models straight to JSON through Pydantic
+# (and deprecates ORJSONResponse); older releases validate item by item and
+# render with stdlib json, so there we dump the list ourselves via orjson.
+FASTAPI_NATIVE_JSON = tuple(int(p) for p in fastapi_version.split(".")[:2]) >= (0, 131)
+
+# Serializes the whole list in one pass instead of per-item response validation
+_TASK_LIST_ADAPTER = TypeAdapter(list[Task])
+
 # ─── In-Memory Store ──────────────────────────────────────────────────────────
-# Dictionary: { task_id: Task }  — scoped to this module, shared across requests
-task_store: dict[str, Task] = {}
+class TaskStore:
+    """
+    Dict-like { task_id: Task } store that also keeps running status counts,
+    a min-heap of open deadlines, inverted indexes for the list filters and
+    lowercased search text, all updated on every write.
+    """
+
+    def __init__(self):
+        self.by_id: dict[str, Task] = {}
+        # Indexed by StatusCode
+        self.status_counts: list[int] = [0] * len(StatusCode)
+        # (deadline, version, task_id) for not-completed tasks with a deadline.
+        # Entries are invalidated lazily: only the version recorded in
+        # deadline_versions is live, anything else is skipped and compacted.
+        self.deadline_heap: list[tuple[datetime, int, str]] = []
+        self.deadline_versions: dict[str, int] = {}
+        self._versions = itertools.count()
+        # Inverted indexes: field value -> ids (category keyed lowercased)
+        self.by_status: dict[str, set[str]] = {}
+        self.by_priority: dict[str, set[str]] = {}
+        self.by_category: dict[str, set[str]] = {}
+        # Lowercased "title\0description"; the separator stops matches spanning both
+        self.search_blobs: dict[str, str] = {}
+
+    def _index_keys(self, task: Task):
+        yield self.by_status, task.status
+        yield self.by_priority, task.priority
+        if task.category:
+            yield self.by_category, task.category.lower()
+
+    def _prepare(self, task: Task) -> tuple:
+        """Derive everything _track needs; anything that can raise happens here"""
+        status = STATUS_CODES[task.status]
+        keys = list(self._index_keys(task))
+        blob = (task.title + "\0" + (task.description or "")).lower()
+        deadline = None
+        if task.deadline and task.status != "completed":
+            try:
+                deadline = parse_iso(task.deadline)
+            except Exception:
+                pass
+            # Offset-aware deadlines never compare against the naive local clock
+            if deadline is not None and deadline.tzinfo is not None:
+                deadline = None
+        return status, keys, blob, deadline
+
+    def _track(self, task_id: str, prepared: tuple):
+        status, keys, blob, deadline = prepared
+        self.status_counts[status] += 1
+        for index, key in keys:
+            index.setdefault(key, set()).add(task_id)
+        self.search_blobs[task_id] = blob
+        if deadline is None:
+            return
+        version = next(self._versions)
+        self.deadline_versions[task_id] = version
+        heapq.heappush(self.deadline_heap, (deadline, version, task_id))
+
+    def _untrack(self, task_id: str, task: Task):
+        self.status_counts[STATUS_CODES[task.status]] -= 1
+        for index, key in self._index_keys(task):
+            ids = index[key]
+            ids.discard(task_id)
+            if not ids:
+                del index[key]
+        self.search_blobs.pop(task_id, None)
+        if self.deadline_versions.pop(task_id, None) is not None:
+            if len(self.deadline_heap) > 2 * len(self.deadline_versions) + 64:
+                self.deadline_heap = [
+                    e for e in self.deadline_heap if self.deadline_versions.get(e[2]) == e[1]
+                ]
+                heapq.heapify(self.deadline_heap)
+
+    def count_overdue(self, now: datetime) -> int:
+        """Count live heap entries before `now`, pruning subtrees that start after it"""
+        heap = self.deadline_heap
+        count = 0
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            deadline, version, task_id = heap[i]
+            if deadline >= now:
+                continue
+            if self.deadline_versions.get(task_id) == version:
+                count += 1
+            stack.extend(c for c in (2 * i + 1, 2 * i + 2) if c < len(heap))
+        return count
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.by_id
+
+    def __getitem__(self, task_id: str) -> Task:
+        return self.by_id[task_id]
+
+    def __setitem__(self, task_id: str, task: Task):
+        # Prepare before untracking the previous version so an invalid task
+        # raises with the store untouched
+        prepared = self._prepare(task)
+
+        previous = self.by_id.get(task_id)
+        if previous is not None:
+            self._untrack(task_id, previous)
+        self._track(task_id, prepared)
+        self.by_id[task_id] = task
+
+    def __delitem__(self, task_id: str):
+        self._untrack(task_id, self.by_id.pop(task_id))
+
+    def values(self):
+        return self.by_id.values()
+
+    def update(self, tasks: dict[str, Task]):
+        for task_id, task in tasks.items():
+            self[task_id] = task
+
+
+# Scoped to this module, shared across requests
+task_store = TaskStore()
 
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
-def is_overdue(task: Task) -> bool:
-    if not task.deadline or task.status == "completed":
-        return False
-    try:
-        return datetime.fromisoformat(task.deadline) < datetime.now()
-    except Exception:
-        return False
+def deadline_timestamp(task: Task) -> float:
+    """Numeric sort key for deadlines; missing or unparseable ones sort last"""
+    if task.deadline:
+        try:
+            return parse_iso(task.deadline).timestamp()
+        except Exception:
+            pass
+    return float("inf")
 
 
 # ─── Routes ──────────────────────────────────────────────────────────────────
@@ -36,17 +171,15 @@ def is_overdue(task: Task) -> bool:
 @router.get("/stats", response_model=TasksStatsResponse)
 async def get_stats():
     """Return aggregate task statistics"""
-    tasks = list(task_store.values())
-    total = len(tasks)
-    completed = sum(1 for t in tasks if t.status == "completed")
-    pending = sum(1 for t in tasks if t.status == "pending")
-    in_progress = sum(1 for t in tasks if t.status == "in-progress")
-    overdue = sum(1 for t in tasks if is_overdue(t))
+    counts = task_store.status_counts
+    total = len(task_store)
+    completed = counts[StatusCode.COMPLETED]
+    overdue = task_store.count_overdue(datetime.now())
     return TasksStatsResponse(
         total=total,
         completed=completed,
-        pending=pending,
-        inProgress=in_progress,
+        pending=counts[StatusCode.PENDING],
+        inProgress=counts[StatusCode.IN_PROGRESS],
         overdue=overdue,
         progress=round((completed / total) * 100, 1) if total > 0 else 0.0,
     )
@@ -61,27 +194,41 @@ async def list_tasks(
     sort_by: str = Query("createdAt", description="Sort field: createdAt | deadline | priority"),
 ):
     """List all tasks with optional filtering and sorting"""
-    tasks = list(task_store.values())
-
-    if status:
-        tasks = [t for t in tasks if t.status == status]
-    if priority:
-        tasks = [t for t in tasks if t.priority == priority]
-    if category:
-        tasks = [t for t in tasks if t.category and t.category.lower() == category.lower()]
+    filters = [
+        (task_store.by_status, status),
+        (task_store.by_priority, priority),
+        (task_store.by_category, category.lower() if category else None),
+    ]
+    matching: Optional[set[str]] = None
+    for index, key in filters:
+        if key:
+            ids = index.get(key, set())
+            matching = ids if matching is None else matching & ids
+
+    if matching is None:
+        tasks = list(task_store.values())
+    else:
+        tasks = [task_store[task_id] for task_id in matching]
+
     if search:
         q = search.lower()
-        tasks = [t for t in tasks if q in t.title.lower() or (t.description and q in t.description.lower())]
+        blobs = task_store.search_blobs
+        tasks = [t for t in tasks if q in blobs[t.id]]
 
     priority_order = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+    # Index sets are unordered, so ties fall back to creation order
     if sort_by == "priority":
-        tasks.sort(key=lambda t: priority_order.get(t.priority, 0), reverse=True)
+        tasks.sort(key=lambda t: (-priority_order.get(t.priority, 0), t.createdAt))
     elif sort_by == "deadline":
-        tasks.sort(key=lambda t: t.deadline or "9999", reverse=False)
+        tasks.sort(key=lambda t: (deadline_timestamp(t), t.createdAt))
     else:
         tasks.sort(key=lambda t: t.createdAt, reverse=True)
 
-    return tasks
+    if FASTAPI_NATIVE_JSON:
+        return tasks
+    # Returning a Response skips FastAPI's response_model re-validation;
+    # response_model is kept for the OpenAPI schema
+    return ORJSONResponse(_TASK_LIST_ADAPTER.dump_python(tasks, mode="json"))
 
 
 @router.post("", response_model=Task, status_code=201)
@@ -108,7 +255,12 @@ async def update_task(task_id: str, payload: TaskUpdate):
 
     existing = task_store[task_id]
     update_data = payload.model_dump(exclude_unset=True)
-    updated = existing.model_copy(update={**update_data, "updatedAt": datetime.now().isoformat()})
+    # An explicit null cannot clear a required field; treat it as "unchanged"
+    for field in ("title", "status", "priority"):
+        if update_data.get(field, ...) is None:
+            del update_data[field]
+    # Payload was validated as TaskUpdate and the stored task is already valid
+    updated = Task.model_construct(**{**existing.model_dump(), **update_data, "updatedAt": datetime.now().isoformat()})
     task_store[task_id] = updated
     return updated
 